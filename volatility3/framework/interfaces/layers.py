@@ -7,14 +7,15 @@ One layer may combine other layers, map data based on the data itself,
 or map a procedure (such as decryption) across another layer of data.
 """
 import collections.abc
+import ctypes
 import functools
 import logging
 import math
 import multiprocessing
-import multiprocessing.managers
+import multiprocessing.pool
+import queue
 import threading
 import traceback
-import types
 from abc import ABCMeta, abstractmethod
 from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
@@ -22,9 +23,18 @@ from volatility3.framework import constants, exceptions, interfaces
 
 vollog = logging.getLogger(__name__)
 
-ProgressValue = Union["DummyProgress", multiprocessing.managers.ValueProxy]
+ProgressValue = Union["DummyProgress", ctypes.c_ulonglong]
 IteratorValue = Tuple[List[Tuple[str, int, int]], int]
 
+# Shared memory values cannot be pickled with each task, so workers receive it when they start
+_shared_progress: Optional[ProgressValue] = None
+
+
+def _set_shared_progress(progress: ProgressValue) -> None:
+    """Stores the progress value shared with a scanning worker process."""
+    global _shared_progress
+    _shared_progress = progress
+
 
 class ScannerInterface(
     interfaces.configuration.VersionableInterface, metaclass=ABCMeta
@@ -118,6 +128,12 @@ class DataLayerInterface(
         super().__init__(context, config_path)
         self._name = name
         self._metadata = metadata or {}
+        self._dependency_names: Tuple[str, ...] = ()
+        self._dependency_layers: Tuple["DataLayerInterface", ...] = ()
+        self._metadata_maps: Tuple[Mapping, ...] = ()
+        self._metadata_snapshot: Optional[Mapping] = None
+        self._address_mask_maximum: Optional[int] = None
+        self._address_mask = 0
 
     # Standard attributes
 
@@ -140,7 +156,12 @@ class DataLayerInterface(
     def address_mask(self) -> int:
         """Returns a mask which encapsulates all the active bits of an address
         for this layer."""
-        return (1 << int(math.ceil(math.log2(self.maximum_address)))) - 1
+        maximum_address = self.maximum_address
+        # Only recalculate the mask if the maximum address has changed since it was last computed
+        if self._address_mask_maximum != maximum_address:
+            self._address_mask = (1 << int(math.ceil(math.log2(maximum_address)))) - 1
+            self._address_mask_maximum = maximum_address
+        return self._address_mask
 
     @abstractmethod
     def is_valid(self, offset: int, length: int = 1) -> bool:
@@ -241,31 +262,50 @@ class DataLayerInterface(
 
         try:
             progress: ProgressValue = DummyProgress()
-            scan_iterator = functools.partial(self._scan_iterator, scanner, sections)
+            scan_iterator = self._scan_iterator(scanner, sections)
             scan_metric = self._scan_metric(scanner, sections)
             if (
                 not scanner.thread_safe
                 or constants.PARALLELISM == constants.Parallelism.Off
             ):
                 progress = DummyProgress()
-                scan_chunk = functools.partial(self._scan_chunk, scanner, progress)
-                for value in scan_iterator():
+                chunks: Iterable[Tuple[bytes, int]]
+                if constants.PARALLELISM == constants.Parallelism.Threading:
+                    # The scanner must stay on this thread, but the next chunk can be read meanwhile
+                    # Only threading mode guarantees the lower layers (such as FileLayer) lock their reads
+                    chunks = self._prefetch_chunks(scan_iterator)
+                else:
+                    chunks = map(self._read_chunk, scan_iterator)
+                for data, chunk_end in chunks:
                     if progress_callback:
                         progress_callback(
                             scan_metric(progress.value),
                             f"Scanning {self.name} using {scanner.__class__.__name__}",
                         )
-                    yield from scan_chunk(value)
+                    yield from self._run_scanner(scanner, progress, data, chunk_end)
             else:
-                progress = multiprocessing.Manager().Value("Q", 0)
-                parallel_module: types.ModuleType = multiprocessing
                 if constants.PARALLELISM == constants.Parallelism.Threading:
+                    # Threads share memory, so each scan hands its own progress to its chunks
                     progress = DummyProgress()
-                    parallel_module = threading
-                scan_chunk = functools.partial(self._scan_chunk, scanner, progress)
-                with parallel_module.Pool() as pool:
-                    result = pool.map_async(scan_chunk, scan_iterator())
-                    while not result.ready():
+                    scan_chunk = functools.partial(self._scan_chunk, scanner, progress)
+                    tasks: Iterable[IteratorValue] = scan_iterator
+                    pool = multiprocessing.pool.ThreadPool()
+                else:
+                    # The pool hands out tasks from a background thread, but lower layers (such as FileLayer)
+                    # do not lock their reads outside threading mode, so the mapping is walked on this thread
+                    tasks = list(scan_iterator)
+                    progress = multiprocessing.Value("Q", 0, lock=False)
+                    scan_chunk = functools.partial(
+                        self._scan_chunk_shared_progress, scanner
+                    )
+                    pool = multiprocessing.pool.Pool(
+                        initializer=_set_shared_progress, initargs=(progress,)
+                    )
+                with pool:
+                    # Results are yielded as soon as each chunk (in order) has been scanned,
+                    # rather than once the whole layer has been
+                    results = pool.imap(scan_chunk, tasks, chunksize=1)
+                    while True:
                         if progress_callback:
                             # Run the progress_callback
                             progress_callback(
@@ -274,8 +314,12 @@ class DataLayerInterface(
                             )
                         # Ensures we don't burn CPU cycles going round in a ready waiting loop
                         # without delaying the user too long between progress updates/results
-                        result.wait(0.1)
-                    for result_value in result.get():
+                        try:
+                            result_value = results.next(0.1)
+                        except multiprocessing.TimeoutError:
+                            continue
+                        except StopIteration:
+                            break
                         yield from result_value
         except Exception as e:
             # We don't care the kind of exception, so catch and report on everything, yielding nothing further
@@ -354,24 +398,98 @@ class DataLayerInterface(
         progress: "ProgressValue",
         iterator_value: IteratorValue,
     ) -> List[Any]:
+        data, chunk_end = self._read_chunk(iterator_value)
+        return self._run_scanner(scanner, progress, data, chunk_end)
+
+    def _read_chunk(self, iterator_value: IteratorValue) -> Tuple[bytes, int]:
+        """Reads the data for a chunk to be scanned, returning it along with
+        the offset at which the chunk ends."""
         data_to_scan, chunk_end = iterator_value
-        data = b""
+        layers = self.context.layers
+        # Chunks are almost always read from a single layer, so only look it up on change
+        current_name = None
+        current_layer = self
+        output: List[bytes] = []
         for layer_name, address, chunk_size in data_to_scan:
+            if layer_name != current_name:
+                current_name, current_layer = layer_name, layers[layer_name]
             try:
-                data += self.context.layers[layer_name].read(address, chunk_size)
+                output.append(current_layer.read(address, chunk_size))
             except exceptions.InvalidAddressException:
                 vollog.debug(
                     "Invalid address in layer {} found scanning {} at address {:x}".format(
                         layer_name, self.name, address
                     )
                 )
+        return b"".join(output), chunk_end
 
+    def _run_scanner(
+        self,
+        scanner: "ScannerInterface",
+        progress: "ProgressValue",
+        data: bytes,
+        chunk_end: int,
+    ) -> List[Any]:
+        """Runs the scanner over a chunk of data that has already been read."""
         if len(data) > scanner.chunk_size + scanner.overlap:
             vollog.debug(f"Scan chunk too large: {hex(len(data))}")
 
         progress.value = chunk_end
         return list(scanner(data, chunk_end - len(data)))
 
+    def _prefetch_chunks(
+        self, scan_iterator: Iterable[IteratorValue], depth: int = 2
+    ) -> Iterable[Tuple[bytes, int]]:
+        """Reads the chunks to be scanned on a background thread, keeping up
+        to depth chunks ready so that reading overlaps with scanning.
+
+        Any exception raised whilst reading is re-raised to the consumer.
+        """
+        chunks: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+        finished = object()
+        stop = threading.Event()
+
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def reader() -> None:
+            try:
+                for value in scan_iterator:
+                    if not put(self._read_chunk(value)):
+                        return None
+            except Exception as excp:
+                put(excp)
+                return None
+            put(finished)
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Let the reader give up if the consumer stops early
+            stop.set()
+            thread.join()
+
+    def _scan_chunk_shared_progress(
+        self, scanner: "ScannerInterface", iterator_value: IteratorValue
+    ) -> List[Any]:
+        """Scans a chunk within a worker, reporting progress through the value
+        the worker was initialized with."""
+        return self._scan_chunk(scanner, _shared_progress, iterator_value)
+
     def _scan_metric(
         self, _scanner: "ScannerInterface", sections: List[Tuple[int, int]]
     ) -> Callable[[int], float]:
@@ -395,15 +513,34 @@ class DataLayerInterface(
 
     # ## Metadata methods
 
+    def _get_dependency_layers(self) -> Tuple["DataLayerInterface", ...]:
+        """Returns the layer objects for this layer's dependencies, only
+        looking them up again if the dependencies have changed."""
+        dependencies = tuple(self.dependencies)
+        if self._dependency_names != dependencies:
+            self._dependency_layers = tuple(
+                self.context.layers[name] for name in dependencies
+            )
+            self._dependency_names = dependencies
+        return self._dependency_layers
+
     @property
     def metadata(self) -> Mapping:
         """Returns a ReadOnly copy of the metadata published by this layer."""
-        maps = [
-            self.context.layers[layer_name].metadata for layer_name in self.dependencies
-        ]
-        return interfaces.objects.ReadOnlyMapping(
-            collections.ChainMap(self._metadata, self._direct_metadata, *maps)
-        )
+        maps = tuple(layer.metadata for layer in self._get_dependency_layers())
+        # Dependencies return the same snapshot until their metadata changes, so rebuild only then
+        if (
+            self._metadata_snapshot is None
+            or len(maps) != len(self._metadata_maps)
+            or any(new is not old for new, old in zip(maps, self._metadata_maps))
+        ):
+            # Earlier mappings take precedence, so apply them last
+            flattened: Dict[str, Any] = {}
+            for mapping in reversed((self._metadata, self._direct_metadata) + maps):
+                flattened.update(mapping)
+            self._metadata_snapshot = interfaces.objects.ReadOnlyMapping(flattened)
+            self._metadata_maps = maps
+        return self._metadata_snapshot
 
 
 class TranslationLayerInterface(DataLayerInterface, metaclass=ABCMeta):
@@ -473,7 +610,9 @@ class TranslationLayerInterface(DataLayerInterface, metaclass=ABCMeta):
         """Reads an offset for length bytes and returns 'bytes' (not 'str') of
         length size."""
         current_offset = offset
-        output: bytes = b""
+        # Fill a single zeroed buffer in place, rather than concatenating each chunk
+        output = bytearray(length)
+        position = 0
         for (
             layer_offset,
             sublength,
@@ -488,7 +627,8 @@ class TranslationLayerInterface(DataLayerInterface, metaclass=ABCMeta):
                     f"Layer {self.name} cannot map offset: {current_offset}",
                 )
             elif layer_offset > current_offset:
-                output += b"\x00" * (layer_offset - current_offset)
+                # The buffer is already zeroed, so the gap only needs skipping
+                position += layer_offset - current_offset
                 current_offset = layer_offset
             # The layer_offset can be less than the current_offset in non-linearly mapped layers
             # it does not suggest an overlap, but that the data is in an encoded block
@@ -503,9 +643,10 @@ class TranslationLayerInterface(DataLayerInterface, metaclass=ABCMeta):
                     raise ValueError(
                         "ProcessedData length does not match expected length of chunk"
                     )
-                output += processed_data
+                output[position : position + sublength] = processed_data
+                position += sublength
                 current_offset += sublength
-        return output + (b"\x00" * (length - len(output)))
+        return bytes(output)
 
     def write(self, offset: int, value: bytes) -> None:
         """Writes a value at offset, distributing the writing across any
@@ -620,6 +761,8 @@ class LayerContainer(collections.abc.Mapping):
 
     def __init__(self) -> None:
         self._layers: Dict[str, DataLayerInterface] = {}
+        # The highest numeric suffix added for each prefix, so name searches don't start from scratch
+        self._name_counters: Dict[str, int] = {}
 
     def read(self, layer: str, offset: int, length: int, pad: bool = False) -> bytes:
         """Reads from a particular layer at offset for length bytes.
@@ -668,6 +811,11 @@ class LayerContainer(collections.abc.Mapping):
                     f"Layer {layer.name} has unmet dependencies: {', '.join(missing_list)}",
                 )
         self._layers[layer.name] = layer
+        prefix, _, suffix = layer.name.rpartition("_")
+        if prefix and suffix.isdigit():
+            self._name_counters[prefix] = max(
+                self._name_counters.get(prefix, 0), int(suffix)
+            )
 
     def del_layer(self, name: str) -> None:
         """Removes the layer called name.
@@ -677,12 +825,16 @@ class LayerContainer(collections.abc.Mapping):
         Args:
             name: The name of the layer to delete
         """
-        for layer in self._layers:
-            if name in self._layers[layer].dependencies:
-                raise exceptions.LayerException(
-                    self._layers[layer].name,
-                    f"Layer {self._layers[layer].name} is depended upon by {layer}",
-                )
+        depend_list = [
+            layer_name
+            for layer_name, layer in self._layers.items()
+            if name in layer.dependencies
+        ]
+        if depend_list:
+            raise exceptions.LayerException(
+                name,
+                f"Layer {name} is depended upon by {', '.join(depend_list)}",
+            )
         # Otherwise, wipe out the layer
         self._layers[name].destroy()
         del self._layers[name]
@@ -699,7 +851,7 @@ class LayerContainer(collections.abc.Mapping):
         """
         if prefix not in self:
             return prefix
-        count = 1
+        count = self._name_counters.get(prefix, 0) + 1
         while f"{prefix}_{count}" in self:
             count += 1
         return f"{prefix}_{count}"
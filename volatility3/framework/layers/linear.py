@@ -3,6 +3,7 @@
 #
 
 import functools
+import itertools
 from typing import List, Optional, Tuple, Iterable
 
 from volatility3.framework import exceptions, interfaces
@@ -17,20 +18,20 @@ class LinearlyMappedLayer(interfaces.layers.TranslationLayerInterface):
     def translate(
         self, offset: int, ignore_errors: bool = False
     ) -> Tuple[Optional[int], Optional[str]]:
-        mapping = list(self.mapping(offset, 0, ignore_errors))
-        if len(mapping) == 1:
-            original_offset, _, mapped_offset, _, layer = mapping[0]
-            if original_offset != offset:
-                raise exceptions.LayerException(
-                    self.name, f"Layer {self.name} claims to map linearly but does not"
-                )
-        else:
+        # Only the first element is needed, so don't build the whole mapping
+        mapping = next(iter(self.mapping(offset, 0, ignore_errors)), None)
+        if mapping is None:
             if ignore_errors:
                 # We should only hit this if we ignored errors, but check anyway
                 return None, None
             raise exceptions.InvalidAddressException(
                 self.name, offset, f"Cannot translate {offset} in layer {self.name}"
             )
+        original_offset, _, mapped_offset, _, layer = mapping
+        if original_offset != offset:
+            raise exceptions.LayerException(
+                self.name, f"Layer {self.name} claims to map linearly but does not"
+            )
         return mapped_offset, layer
 
     # ## Read/Write functions for mapped pages
@@ -40,11 +41,25 @@ class LinearlyMappedLayer(interfaces.layers.TranslationLayerInterface):
     def read(self, offset: int, length: int, pad: bool = False) -> bytes:
         """Reads an offset for length bytes and returns 'bytes' (not 'str') of
         length size."""
+        mappings = iter(self.mapping(offset, length, ignore_errors=pad))
+        first = next(mappings, None)
+        if first is not None:
+            first_offset, _, mapped_offset, mapped_length, layer = first
+            # Most reads fall within a single contiguous mapping, so pass those straight through
+            if length and first_offset == offset and mapped_length == length:
+                second = next(mappings, None)
+                if second is None:
+                    data = self._context.layers.read(
+                        layer, mapped_offset, mapped_length, pad
+                    )
+                    return data + b"\x00" * (length - len(data))
+                mappings = itertools.chain([first, second], mappings)
+            else:
+                mappings = itertools.chain([first], mappings)
+
         current_offset = offset
         output: List[bytes] = []
-        for offset, _, mapped_offset, mapped_length, layer in self.mapping(
-            offset, length, ignore_errors=pad
-        ):
+        for offset, _, mapped_offset, mapped_length, layer in mappings:
             if not pad and offset > current_offset:
                 raise exceptions.InvalidAddressException(
                     self.name,
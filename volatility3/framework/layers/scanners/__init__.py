@@ -21,11 +21,10 @@ class BytesScanner(layers.ScannerInterface):
         """Runs through the data looking for the needle, and yields all offsets
         where the needle is found."""
         find_pos = data.find(self.needle)
-        while find_pos >= 0:
-            # Ensure that if we're in the overlap, we don't report it
-            # It'll be returned when the next block is scanned
-            if find_pos < self.chunk_size:
-                yield find_pos + data_offset
+        # Ensure that if we're in the overlap, we don't report it
+        # It'll be returned when the next block is scanned, so stop searching once we reach it
+        while 0 <= find_pos < self.chunk_size:
+            yield find_pos + data_offset
             find_pos = data.find(self.needle, find_pos + 1)
 
 
@@ -50,8 +49,10 @@ class RegExScanner(layers.ScannerInterface):
         find_pos = self.regex.finditer(data)
         for match in find_pos:
             offset = match.start()
-            if offset < self.chunk_size:
-                yield offset + data_offset
+            # Matches are found in order, so anything from here on is in the overlap
+            if offset >= self.chunk_size:
+                break
+            yield offset + data_offset
 
 
 class MultiStringScanner(layers.ScannerInterface):
@@ -65,6 +66,7 @@ class MultiStringScanner(layers.ScannerInterface):
         for pattern in patterns:
             self._process_pattern(pattern)
         self._regex = self._process_trie(self._pattern_trie)
+        self._compiled_regex = re.compile(self._regex)
 
     def _process_pattern(self, value: bytes) -> None:
         trie = self._pattern_trie
@@ -124,8 +126,10 @@ class MultiStringScanner(layers.ScannerInterface):
     ) -> Generator[Tuple[int, bytes], None, None]:
         """Runs through the data looking for the needles."""
         for offset, pattern in self.search(data):
-            if offset < self.chunk_size:
-                yield offset + data_offset, pattern
+            # Matches are found in order, so anything from here on is in the overlap
+            if offset >= self.chunk_size:
+                break
+            yield offset + data_offset, pattern
 
     def search(self, haystack: bytes) -> Generator[Tuple[int, bytes], None, None]:
         if not isinstance(haystack, bytes):
@@ -134,5 +138,5 @@ class MultiStringScanner(layers.ScannerInterface):
             raise ValueError(
                 "MultiRegexp cannot be used with an empty set of search strings"
             )
-        for match in re.finditer(self._regex, haystack):
+        for match in self._compiled_regex.finditer(haystack):
             yield match.start(0), match.group()
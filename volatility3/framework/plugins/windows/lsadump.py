@@ -1,12 +1,13 @@
 # This file is Copyright 2020 Volatility Foundation and licensed under the Volatility Software License 1.0
 # which is available at https://www.volatilityfoundation.org/license/vsl-v1.0
 #
+import hashlib
 import logging
-from struct import unpack
-from typing import Optional
+from struct import unpack_from
+from typing import Dict, List, Optional
 
 from Crypto.Cipher import ARC4, DES, AES
-from Crypto.Hash import MD5, SHA256
+from Crypto.Hash import MD5
 
 from volatility3.framework import interfaces, renderers
 from volatility3.framework.configuration import requirements
@@ -22,7 +23,7 @@ class Lsadump(interfaces.plugins.PluginInterface):
     """Dumps lsa secrets from memory"""
 
     _required_framework_version = (2, 0, 0)
-    _version = (1, 0, 0)
+    _version = (1, 1, 0)
 
     @classmethod
     def get_requirements(cls):
@@ -45,21 +46,17 @@ class Lsadump(interfaces.plugins.PluginInterface):
         """
         Based on code from http://lab.mediaservice.net/code/cachedump.rb
         """
-        sha = SHA256.new()
-        sha.update(key)
-        for _i in range(1, 1000 + 1):
-            sha.update(secret[28:60])
+        sha = hashlib.sha256(key)
+        sha.update(secret[28:60] * 1000)
         aeskey = sha.digest()
 
-        data = b""
-        for i in range(60, len(secret), 16):
-            aes = AES.new(aeskey, AES.MODE_CBC, b"\x00" * 16)
-            buf = secret[i : i + 16]
-            if len(buf) < 16:
-                buf += (16 - len(buf)) * "\00"
-            data += aes.decrypt(buf)
+        # Every block was historically decrypted with a fresh zero-IV CBC cipher,
+        # which is equivalent to ECB over the whole (null padded) buffer
+        data = secret[60:]
+        if len(data) % 16:
+            data += b"\x00" * (16 - len(data) % 16)
 
-        return data
+        return AES.new(aeskey, AES.MODE_ECB).decrypt(data)
 
     @classmethod
     def get_lsa_key(
@@ -86,10 +83,8 @@ class Lsadump(interfaces.plugins.PluginInterface):
         if not obf_lsa_key:
             return None
         if not vista_or_later:
-            md5 = MD5.new()
-            md5.update(bootkey)
-            for _i in range(1000):
-                md5.update(obf_lsa_key[60:76])
+            md5 = MD5.new(bootkey)
+            md5.update(obf_lsa_key[60:76] * 1000)
             rc4key = md5.digest()
 
             rc4 = ARC4.new(rc4key)
@@ -109,14 +104,34 @@ class Lsadump(interfaces.plugins.PluginInterface):
         name: str,
         lsakey: bytes,
         is_vista_or_later: bool,
-    ):
-        enc_secret_key = hashdump.Hashdump.get_hive_key(
-            sechive, "Policy\\Secrets\\" + name + "\\CurrVal"
+    ) -> Optional[bytes]:
+        secret_key = hashdump.Hashdump.get_hive_key(sechive, "Policy\\Secrets\\" + name)
+        if not secret_key:
+            return None
+
+        return cls.get_secret_from_key(sechive, secret_key, lsakey, is_vista_or_later)
+
+    @classmethod
+    def get_secret_from_key(
+        cls,
+        sechive: registry.RegistryHive,
+        secret_key: interfaces.objects.ObjectInterface,
+        lsakey: bytes,
+        is_vista_or_later: bool,
+    ) -> Optional[bytes]:
+        """Decrypts the current value of an already resolved Policy\\Secrets subkey."""
+        enc_secret_key = next(
+            (
+                subkey
+                for subkey in secret_key.get_subkeys()
+                if subkey.get_name().lower() == "currval"
+            ),
+            None,
         )
 
         secret = None
         if enc_secret_key:
-            enc_secret_value = next(enc_secret_key.get_values())
+            enc_secret_value = next(enc_secret_key.get_values(), None)
             if enc_secret_value:
                 enc_secret = sechive.read(
                     enc_secret_value.Data + 4, enc_secret_value.DataLength
@@ -130,46 +145,51 @@ class Lsadump(interfaces.plugins.PluginInterface):
         return secret
 
     @classmethod
-    def decrypt_secret(cls, secret: bytes, key: bytes):
+    def decrypt_secret(cls, secret: bytes, key: bytes) -> bytes:
         """Python implementation of SystemFunction005.
 
         Decrypts a block of data with DES using given key.
         Note that key can be longer than 7 bytes."""
-        decrypted_data = b""
-        j = 0  # key index
+        if len(secret) % 8:
+            secret += b"\x00" * (8 - len(secret) % 8)
+        block_count = len(secret) // 8
 
-        for i in range(0, len(secret), 8):
-            enc_block = secret[i : i + 8]
-            block_key = key[j : j + 7]
-            des_key = hashdump.Hashdump.sidbytes_to_key(block_key)
-            des = DES.new(des_key, DES.MODE_ECB)
-            enc_block = enc_block + b"\x00" * int(abs(8 - len(enc_block)) % 8)
-            decrypted_data += des.decrypt(
-                enc_block
-            )  # lgtm [py/weak-cryptographic-algorithm]
+        # The key schedule cycles through a small set of 7 byte slices of the key, and since
+        # each block is decrypted independently, all blocks sharing a slice can be decrypted at once
+        key_blocks: Dict[int, List[int]] = {}
+        j = 0  # key index
+        for block in range(block_count):
+            key_blocks.setdefault(j, []).append(block)
             j += 7
             if len(key[j : j + 7]) < 7:
                 j = len(key[j : j + 7])
 
-        (dec_data_len,) = unpack("<L", decrypted_data[:4])
+        decrypted_blocks: List[bytes] = [b""] * block_count
+        for j, blocks in key_blocks.items():
+            des_key = hashdump.Hashdump.sidbytes_to_key(key[j : j + 7])
+            des = DES.new(des_key, DES.MODE_ECB)
+            enc_data = b"".join(secret[block * 8 : block * 8 + 8] for block in blocks)
+            dec_data = des.decrypt(enc_data)  # lgtm [py/weak-cryptographic-algorithm]
+            for index, block in enumerate(blocks):
+                decrypted_blocks[block] = dec_data[index * 8 : index * 8 + 8]
+        decrypted_data = b"".join(decrypted_blocks)
+
+        (dec_data_len,) = unpack_from("<L", decrypted_data, 0)
 
         return decrypted_data[8 : 8 + dec_data_len]
 
     def _generator(
-        self, syshive: registry.RegistryHive, sechive: registry.RegistryHive
+        self,
+        syshive: registry.RegistryHive,
+        sechive: registry.RegistryHive,
+        vista_or_later: bool,
     ):
-        kernel = self.context.modules[self.config["kernel"]]
-
-        vista_or_later = versions.is_vista_or_later(
-            context=self.context, symbol_table=kernel.symbol_table_name
-        )
-
         bootkey = hashdump.Hashdump.get_bootkey(syshive)
-        lsakey = self.get_lsa_key(sechive, bootkey, vista_or_later)
         if not bootkey:
             vollog.warning("Unable to find bootkey")
             return None
 
+        lsakey = self.get_lsa_key(sechive, bootkey, vista_or_later)
         if not lsakey:
             vollog.warning("Unable to find lsa key")
             return None
@@ -180,27 +200,10 @@ class Lsadump(interfaces.plugins.PluginInterface):
             return None
 
         for key in secrets_key.get_subkeys():
-            sec_val_key = hashdump.Hashdump.get_hive_key(
-                sechive,
-                "Policy\\Secrets\\" + key.get_key_path().split("\\")[3] + "\\CurrVal",
-            )
-            if not sec_val_key:
+            secret = self.get_secret_from_key(sechive, key, lsakey, vista_or_later)
+            if secret is None:
                 continue
 
-            enc_secret_value = next(sec_val_key.get_values())
-            if not enc_secret_value:
-                continue
-
-            enc_secret = sechive.read(
-                enc_secret_value.Data + 4, enc_secret_value.DataLength
-            )
-            if not enc_secret:
-                continue
-            if not vista_or_later:
-                secret = self.decrypt_secret(enc_secret[0xC:], lsakey)
-            else:
-                secret = self.decrypt_aes(enc_secret, lsakey)
-
             yield (0, (key.get_name(), secret.decode("latin1"), secret))
 
     def run(self):
@@ -215,12 +218,17 @@ class Lsadump(interfaces.plugins.PluginInterface):
             kernel.symbol_table_name,
             hive_offsets=None if offset is None else [offset],
         ):
-            if hive.get_name().split("\\")[-1].upper() == "SYSTEM":
+            hive_name = hive.get_name().split("\\")[-1].upper()
+            if hive_name == "SYSTEM":
                 syshive = hive
-            if hive.get_name().split("\\")[-1].upper() == "SECURITY":
+            if hive_name == "SECURITY":
                 sechive = hive
 
+        vista_or_later = versions.is_vista_or_later(
+            context=self.context, symbol_table=kernel.symbol_table_name
+        )
+
         return renderers.TreeGrid(
             [("Key", str), ("Secret", str), ("Hex", bytes)],
-            self._generator(syshive, sechive),
+            self._generator(syshive, sechive, vista_or_later),
         )